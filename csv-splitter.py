@@ -1,8 +1,14 @@
 import csv
 import os
+import mmap
 import argparse
 from pathlib import Path
 
+IO_BUFFER_SIZE = 1 << 20  # 1 MiB buffer for CSV reads and writes (default is 8 KiB)
+MIN_ROWS_PER_CHUNK = 100
+ESTIMATE_SAMPLE_BYTES = 1 << 20  # Read at most 1 MiB when estimating rows per chunk
+FAST_BYTES_BLOCK_SIZE = 4 << 20  # 4 MiB windows for the --fast-bytes copy
+
 def get_file_size_mb(file_path):
     """Get file size in MB."""
     return os.path.getsize(file_path) / (1024 * 1024)
@@ -11,6 +17,9 @@ def estimate_rows_per_chunk(input_file, target_size_mb):
     """
     Estimate how many rows should be in each chunk to achieve target size.
     
+    The estimate is based on the average row length in the first
+    ESTIMATE_SAMPLE_BYTES of the file, so it never reads the whole file.
+    
     Args:
         input_file (str): Path to input CSV file
         target_size_mb (float): Target chunk size in MB
@@ -18,27 +27,25 @@ def estimate_rows_per_chunk(input_file, target_size_mb):
     Returns:
         int: Estimated rows per chunk
     """
-    total_size_mb = get_file_size_mb(input_file)
+    with open(input_file, 'rb') as f:
+        sample = f.read(ESTIMATE_SAMPLE_BYTES)
     
-    # Count total rows (excluding header)
-    with open(input_file, 'r', newline='', encoding='utf-8') as f:
-        reader = csv.reader(f)
-        next(reader)  # Skip header
-        total_rows = sum(1 for _ in reader)
+    rows_in_sample = sample.count(b'\n')
     
-    if total_rows == 0:
+    # A sample with no complete row means rows are at least as long as the sample
+    if rows_in_sample == 0:
         return 1
     
-    # Calculate approximate rows per MB
-    rows_per_mb = total_rows / total_size_mb
+    # Calculate approximate bytes per row
+    avg_row_bytes = len(sample) / rows_in_sample
     
     # Estimate rows needed for target size
-    estimated_rows = int(rows_per_mb * target_size_mb)
+    estimated_rows = int(target_size_mb * 1024 * 1024 / avg_row_bytes)
     
     # Ensure at least 1 row per chunk
     return max(1, estimated_rows)
 
-def split_csv_by_size(input_file, chunk_size_mb, output_dir=None, keep_header=True):
+def split_csv_by_size(input_file, chunk_size_mb, output_dir=None, keep_header=True, fast_bytes=False):
     """
     Split a large CSV file into smaller chunks based on file size.
     
@@ -47,6 +54,8 @@ def split_csv_by_size(input_file, chunk_size_mb, output_dir=None, keep_header=Tr
         chunk_size_mb (float): Target size for each chunk in MB
         output_dir (str): Directory to save chunks (default: same as input file)
         keep_header (bool): Whether to include header in each chunk
+        fast_bytes (bool): Copy raw bytes and split on newlines instead of parsing
+            rows with the csv module. Only safe when no field contains a newline.
     
     Returns:
         list: List of created chunk file paths
@@ -72,80 +81,182 @@ def split_csv_by_size(input_file, chunk_size_mb, output_dir=None, keep_header=Tr
     print(f"Estimated ~{estimated_rows} rows per {chunk_size_mb}MB chunk")
     
     chunk_files = []
+    chunk_sizes = []  # Bytes written per chunk, so the summary doesn't stat every file again
     chunk_number = 1
     target_size_bytes = chunk_size_mb * 1024 * 1024  # Convert MB to bytes
     
-    with open(input_file, 'r', newline='', encoding='utf-8') as infile:
-        reader = csv.reader(infile)
-        
-        # Read header
-        try:
-            header = next(reader)
-        except StopIteration:
-            raise ValueError("CSV file is empty")
-        
-        current_chunk = []
-        
-        for row in reader:
-            current_chunk.append(row)
+    if fast_bytes:
+        chunk_files, chunk_sizes = split_csv_bytes(input_file, output_dir, base_name, extension, target_size_bytes, keep_header)
+    else:
+        with open(input_file, 'r', newline='', encoding='utf-8', buffering=IO_BUFFER_SIZE) as infile:
+            reader = csv.reader(infile)
+            
+            # Read header
+            try:
+                header = next(reader)
+            except StopIteration:
+                raise ValueError("CSV file is empty")
+            
+            # writerow returns the number of characters written, which gives a running
+            # size without re-serializing or stat-ing the chunk. Characters undercount
+            # bytes for non-ASCII text, so each chunk's character budget is calibrated
+            # from the bytes per character measured on the previous chunk.
+            target_chars = target_size_bytes
             
-            # Check if we should write the chunk (every 100 rows to avoid frequent checks)
-            if len(current_chunk) % 100 == 0:
-                # Create temporary chunk to check size
-                temp_chunk_path = output_dir / f"temp_chunk{extension}"
-                write_chunk(temp_chunk_path, header if keep_header else None, current_chunk)
-                current_size = os.path.getsize(temp_chunk_path)
+            # Each pass of the outer loop opens one chunk file and streams rows into it
+            # until the running size crosses the target; the inner loop shares the same
+            # reader, so the next chunk picks up exactly where this one stopped.
+            for first_row in reader:
+                chunk_filename = f"{base_name}_chunk_{chunk_number:03d}{extension}"
+                chunk_path = output_dir / chunk_filename
                 
-                # If chunk exceeds target size, write it (but keep at least 100 rows)
-                if current_size >= target_size_bytes and len(current_chunk) >= 100:
-                    chunk_filename = f"{base_name}_chunk_{chunk_number:03d}{extension}"
-                    chunk_path = output_dir / chunk_filename
+                with open(chunk_path, 'w', newline='', encoding='utf-8', buffering=IO_BUFFER_SIZE) as outfile:
+                    writer = csv.writer(outfile)
                     
-                    # Rename temp file to final chunk name
-                    temp_chunk_path.rename(chunk_path)
-                    chunk_files.append(str(chunk_path))
+                    chars_written = writer.writerow(header) if keep_header else 0
+                    chars_written += writer.writerow(first_row)
+                    row_count = 1
                     
-                    chunk_size_mb_actual = current_size / (1024 * 1024)
-                    print(f"Created chunk {chunk_number}: {chunk_filename} ({len(current_chunk)} rows, {chunk_size_mb_actual:.2f}MB)")
+                    for row in reader:
+                        line = plain_csv_line(row)
+                        chars_written += outfile.write(line) if line else writer.writerow(row)
+                        row_count += 1
+                        
+                        # Close the chunk once it reaches the target size (but keep at least 100 rows)
+                        if chars_written >= target_chars and row_count >= MIN_ROWS_PER_CHUNK:
+                            break
                     
-                    # Reset for next chunk
-                    current_chunk = []
-                    chunk_number += 1
-                else:
-                    # Remove temp file if we're not done with this chunk
-                    temp_chunk_path.unlink()
-        
-        # Write remaining rows if any
-        if current_chunk:
-            chunk_filename = f"{base_name}_chunk_{chunk_number:03d}{extension}"
-            chunk_path = output_dir / chunk_filename
-            
-            write_chunk(chunk_path, header if keep_header else None, current_chunk)
-            chunk_files.append(str(chunk_path))
-            
-            final_size_mb = get_file_size_mb(chunk_path)
-            print(f"Created chunk {chunk_number}: {chunk_filename} ({len(current_chunk)} rows, {final_size_mb:.2f}MB)")
-    
-    # Clean up any remaining temp files
-    temp_files = list(output_dir.glob("temp_chunk*"))
-    for temp_file in temp_files:
-        temp_file.unlink()
+                    current_size = outfile.tell()
+                
+                target_chars = target_size_bytes * chars_written / current_size
+                
+                chunk_files.append(str(chunk_path))
+                chunk_sizes.append(current_size)
+                
+                chunk_size_mb_actual = current_size / (1024 * 1024)
+                print(f"Created chunk {chunk_number}: {chunk_filename} ({row_count} rows, {chunk_size_mb_actual:.2f}MB)")
+                
+                chunk_number += 1
     
     total_chunks = len(chunk_files)
-    total_output_size = sum(get_file_size_mb(f) for f in chunk_files)
+    total_output_size = sum(chunk_sizes) / (1024 * 1024)
     print(f"\nSplit complete! Created {total_chunks} chunk files totaling {total_output_size:.2f}MB.")
     
     return chunk_files
 
-def write_chunk(output_path, header, rows):
-    """Write a chunk of data to CSV file."""
-    with open(output_path, 'w', newline='', encoding='utf-8') as outfile:
-        writer = csv.writer(outfile)
+def split_csv_bytes(input_file, output_dir, base_name, extension, target_size_bytes, keep_header=True):
+    """
+    Split a CSV file into chunks by copying raw byte ranges, without the csv module.
+    
+    The input is memory-mapped and chunk boundaries are found by jumping to the
+    target offset and searching for the next newline, so rows are never iterated
+    in Python. Chunk bodies are copied with os.sendfile where available. Chunks
+    always end on a newline, so this is only correct for files whose fields never
+    contain embedded newlines.
+    
+    Args:
+        input_file (str): Path to the input CSV file
+        output_dir (Path): Directory to save chunks
+        base_name (str): Base name for chunk files
+        extension (str): Extension for chunk files
+        target_size_bytes (float): Target size for each chunk in bytes
+        keep_header (bool): Whether to include header in each chunk
+    
+    Returns:
+        tuple: (list of created chunk file paths, list of their sizes in bytes)
+    """
+    chunk_files = []
+    chunk_sizes = []
+    chunk_number = 1
+    
+    with open(input_file, 'rb') as infile:
+        header = infile.readline()
+        if not header:
+            raise ValueError("CSV file is empty")
         
-        if header:
-            writer.writerow(header)
+        file_size = os.fstat(infile.fileno()).st_size
+        if file_size == len(header):
+            return chunk_files, chunk_sizes
         
-        writer.writerows(rows)
+        with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = len(header)
+            while pos < file_size:
+                # The chunk ends at the newline that terminates the row reaching the target size
+                header_size = len(header) if keep_header else 0
+                target_end = pos + max(1, int(target_size_bytes - header_size))
+                end = mm.find(b'\n', target_end - 1) + 1 or file_size
+                
+                # Keep at least 100 rows per chunk
+                row_count = count_newlines(mm, pos, end)
+                while row_count < MIN_ROWS_PER_CHUNK and end < file_size:
+                    end = mm.find(b'\n', end) + 1 or file_size
+                    row_count += mm[end - 1:end] == b'\n'
+
+                # Count a final row that has no trailing newline
+                if end == file_size and mm[end - 1:end] != b'\n':
+                    row_count += 1
+                
+                chunk_path = output_dir / f"{base_name}_chunk_{chunk_number:03d}{extension}"
+                # Unbuffered: the body is copied by the kernel straight into the file descriptor
+                with open(chunk_path, 'wb', buffering=0) as outfile:
+                    current_size = outfile.write(header) if keep_header else 0
+                    current_size += copy_byte_range(infile, mm, outfile, pos, end)
+                
+                chunk_files.append(str(chunk_path))
+                chunk_sizes.append(current_size)
+                print(f"Created chunk {chunk_number}: {chunk_path.name} ({row_count} rows, {current_size / (1024 * 1024):.2f}MB)")
+                
+                chunk_number += 1
+                pos = end
+    
+    return chunk_files, chunk_sizes
+
+def copy_byte_range(infile, mm, outfile, start, end):
+    """
+    Copy bytes [start, end) of infile to the unbuffered outfile.
+    
+    Uses os.sendfile so the data never passes through user space; where sendfile
+    is unavailable or refuses regular files (Windows, macOS), the rest is written
+    from the memory-mapped input instead.
+    
+    Returns:
+        int: Number of bytes copied
+    """
+    offset = start
+    if hasattr(os, 'sendfile'):
+        try:
+            while offset < end:
+                sent = os.sendfile(outfile.fileno(), infile.fileno(), offset, end - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        except OSError:
+            pass
+    
+    for window_start in range(offset, end, FAST_BYTES_BLOCK_SIZE):
+        outfile.write(mm[window_start:min(window_start + FAST_BYTES_BLOCK_SIZE, end)])
+    
+    return end - start
+
+def count_newlines(buffer, start, end):
+    """Count newlines in buffer[start:end], scanning FAST_BYTES_BLOCK_SIZE bytes at a time."""
+    return sum(
+        buffer[offset:min(offset + FAST_BYTES_BLOCK_SIZE, end)].count(b'\n')
+        for offset in range(start, end, FAST_BYTES_BLOCK_SIZE)
+    )
+
+def plain_csv_line(row):
+    """
+    Join a row that needs no CSV quoting into a line, or return None.
+    
+    When no field contains a delimiter, quote or line break, csv.writer would emit
+    exactly the joined fields plus its CRLF terminator, so the per-field quoting
+    checks can be skipped.
+    """
+    line = ','.join(row)
+    if line and line.count(',') == len(row) - 1 and '"' not in line and '\r' not in line and '\n' not in line:
+        return line + '\r\n'
+    return None
 
 def main():
     parser = argparse.ArgumentParser(description='Split a large CSV file into smaller chunks by file size')
@@ -154,6 +265,8 @@ def main():
     parser.add_argument('-o', '--output-dir', help='Output directory for chunks')
     parser.add_argument('--no-header', action='store_true', 
                        help='Do not include header in each chunk')
+    parser.add_argument('--fast-bytes', action='store_true',
+                       help='Split raw bytes on newlines without parsing rows (only for CSVs with no multi-line fields)')
     
     args = parser.parse_args()
     
@@ -162,7 +275,8 @@ def main():
             input_file=args.input_file,
             chunk_size_mb=args.chunk_size_mb,
             output_dir=args.output_dir,
-            keep_header=not args.no_header
+            keep_header=not args.no_header,
+            fast_bytes=args.fast_bytes
         )
         
         print(f"\nChunk files created:")
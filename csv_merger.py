@@ -1,12 +1,345 @@
 import pandas as pd
+import numpy as np
 import os
-from io import StringIO
+import re
+import json
+import csv
+import codecs
+from io import BytesIO, RawIOBase
 from azure.storage.blob import BlobServiceClient
+from azure.core.pipeline.transport import RequestsTransport
 from azure.identity import DefaultAzureCredential, AzureCliCredential, ManagedIdentityCredential
 from typing import List, Optional
 import logging
+import logging.handlers
+import heapq
+import functools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.compute as pacompute
+except ImportError:
+    # PyArrow is optional; pandas' own CSV reader/writer is used without it
+    pa = None
+
+try:
+    import duckdb
+except ImportError:
+    # DuckDB is optional; part files are combined with pandas without it
+    duckdb = None
+
+IO_BUFFER_SIZE = 1 << 20  # 1 MiB buffer for local merged files (default is 8 KiB)
+CSV_WRITE_BATCH_ROWS = 64 * 1024  # Rows formatted per batch by PyArrow's CSV writer (default is 1024)
+BLOB_DOWNLOAD_CONCURRENCY = 4  # Parallel range requests within one large blob download (default is 1)
+DOWNLOAD_WINDOW_BYTES = 256 << 20  # Listed blob bytes downloaded ahead of the merge before waiting
+BLOB_UPLOAD_CONCURRENCY = 8  # Parallel block uploads for merged files larger than a single put (default is 1)
+HTTP_POOL_SIZE = 64  # Pooled connections per storage host, enough for all concurrent downloads (default is 10)
+HTTP_READ_BLOCK_SIZE = 4 << 20  # Bytes read per chunk from HTTP response bodies (storage SDK default is 256 KiB)
+HTTP_CONNECT_TIMEOUT = 20  # Seconds before a stalled connection attempt is retried (storage SDK default)
+HTTP_READ_TIMEOUT = 60  # Seconds without response data before a read is retried (storage SDK default)
+LOG_BUFFER_RECORDS = 1024  # Log records buffered before the log file is written
+PART_CHUNK_ROWS = 100_000  # Rows read at a time when combining part files with differing columns
+
+# Azure AD credential classes selectable with credential_type. "default" probes
+# environment, managed identity, Azure CLI, etc. in turn; the others skip the probing.
+AZURE_AD_CREDENTIALS = {
+    'default': DefaultAzureCredential,
+    'cli': AzureCliCredential,
+    'managed_identity': ManagedIdentityCredential,
+}
+
+# Characters that make a CSV value need quoting
+CSV_SPECIAL_CHARS = re.compile(r'[",\r\n]')
+
+# Columns added by previous merges; they are dropped from inputs so they don't repeat
+METADATA_COLUMNS = ['source_file', 'source_path', 'file_size', 'merge_timestamp', 'container_name']
+
+def read_csv_bytes(data: bytes, skip_columns=()) -> pd.DataFrame:
+    """
+    Parse CSV bytes into a DataFrame, using PyArrow's multithreaded reader when installed.
+    
+    Every column is read as text, so values are written back exactly as they appeared
+    (no re-formatted timestamps or booleans, no lost leading zeros, "NA" stays "NA").
+    PyArrow-parsed columns stay Arrow-backed (pd.ArrowDtype) rather than being converted
+    to NumPy/object arrays, so handing them back to PyArrow's writer copies nothing.
+    
+    Args:
+        data (bytes): CSV content including the header row
+        skip_columns (list): Column names that are left out while parsing
+    
+    Returns:
+        DataFrame: Parsed data
+    """
+    header_end = data.find(b'\n')
+    header = data[:header_end if header_end != -1 else len(data)]
+    header = header.rstrip(b'\r').removeprefix(codecs.BOM_UTF8)
+    columns = dedupe_columns(parse_csv_header(header)) if header.strip() else []
+    # Project only if something is skipped and something is left (an empty
+    # include list means "all columns" to PyArrow)
+    usecols = None
+    keep = [col for col in columns if col not in skip_columns]
+    if keep and len(keep) < len(columns):
+        usecols = keep
+    
+    if pa is not None:
+        convert_options = pacsv.ConvertOptions(
+            include_columns=usecols or [], column_types={col: pa.string() for col in columns}
+        )
+        # Repeated header names are renamed as pandas does (a, a.1, ...) rather than kept
+        read_options = pacsv.ReadOptions(column_names=columns, skip_rows=1) if columns else None
+        table = pacsv.read_csv(pa.BufferReader(data), read_options=read_options, convert_options=convert_options)
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+    return pd.read_csv(BytesIO(data), usecols=usecols, dtype=str, keep_default_na=False)
+
+def dedupe_columns(columns: List[str]) -> List[str]:
+    """Rename repeated column names the way pandas' CSV reader does: a, a.1, a.2, ..."""
+    counts = {}
+    result = []
+    for col in columns:
+        count = counts.get(col, 0)
+        while count > 0:
+            counts[col] = count + 1
+            col = f"{col}.{count}"
+            count = counts.get(col, 0)
+        result.append(col)
+        counts[col] = count + 1
+    return result
+
+def needs_quoting(table) -> bool:
+    """Whether a PyArrow table has a column name or text value that must be quoted in CSV."""
+    if any(CSV_SPECIAL_CHARS.search(name) for name in table.column_names):
+        return True
+    for column in table.columns:
+        if pa.types.is_dictionary(column.type):
+            # Only the distinct values need checking
+            column = pa.chunked_array([chunk.dictionary for chunk in column.chunks], column.type.value_type)
+        if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+            if pacompute.any(pacompute.match_substring_regex(column, CSV_SPECIAL_CHARS.pattern)).as_py():
+                return True
+    return False
+
+def write_csv(df: pd.DataFrame, output, include_header: bool = True):
+    """
+    Write a DataFrame as CSV, using PyArrow's writer when installed.
+    
+    PyArrow's writer quotes every text value, so it is only used (without quoting) when
+    no value or column name needs quotes; otherwise pandas writes the frame, quoting
+    just the values that need it. Either way values come out as they were read.
+    
+    Args:
+        df (DataFrame): Data to write
+        output: Binary file object to append to
+        include_header (bool): Whether to write the header row
+    """
+    if pa is not None:
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (ValueError, pa.ArrowTypeError):
+            # Columns mixing types across files, or repeated column names, can't be
+            # converted; let pandas write them
+            pass
+        else:
+            if not needs_quoting(table):
+                if include_header:
+                    output.write((','.join(table.column_names) + '\n').encode('utf-8'))
+                write_options = pacsv.WriteOptions(
+                    include_header=False, batch_size=CSV_WRITE_BATCH_ROWS, quoting_style='none'
+                )
+                pacsv.write_csv(table, output, write_options=write_options)
+                return
+    df.to_csv(output, header=include_header, index=False, mode='wb')
+
+def combine_csv_parts(parts, output: str) -> List[str]:
+    """
+    Combine CSV part files with differing columns into one output file.
+    
+    The output has the union of all columns in order of first appearance; rows from a
+    part lacking a column get an empty value there. With DuckDB installed this is a single
+    parallel union_by_name query over the parts, reading every value as text so it is
+    written back unchanged. The dialect is pinned rather than sniffed, so a leading '#'
+    is never taken for a comment and mixed line endings don't fail the read. Otherwise,
+    or if DuckDB fails, the parts are read back with pandas in chunks. Either way memory
+    use doesn't grow with the size of the merge.
+    
+    Args:
+        parts (list): (path, columns) tuples of the part files, in output order
+        output (str): Output file path
+    
+    Returns:
+        list: Column names of the combined output
+    """
+    if duckdb is not None:
+        try:
+            with duckdb.connect() as con:
+                merged = con.read_csv(
+                    [path for path, _ in parts], header=True, union_by_name=True, all_varchar=True,
+                    delimiter=',', quotechar='"', escapechar='"', comment='', strict_mode=False
+                )
+                merged.write_csv(output, header=True)
+                return merged.columns
+        except duckdb.Error as e:
+            logging.getLogger(__name__).warning(f"⚠️  DuckDB could not combine the parts ({e}), using pandas")
+    
+    columns = list(dict.fromkeys(col for _, part_columns in parts for col in part_columns))
+    with open(output, 'wb', buffering=IO_BUFFER_SIZE) as outfile:
+        write_csv(pd.DataFrame(columns=columns), outfile)
+        for path, _ in parts:
+            # Read as text, like DuckDB's all_varchar, so values are written back verbatim
+            chunks = pd.read_csv(
+                path, chunksize=PART_CHUNK_ROWS, memory_map=True, dtype=str, keep_default_na=False
+            )
+            for chunk in chunks:
+                write_csv(chunk.reindex(columns=columns), outfile, include_header=False)
+    return columns
+
+def constant_column(value, length: int) -> pd.Categorical:
+    """Build a column repeating one value, dictionary-encoded so the value is stored once."""
+    return pd.Categorical.from_codes(np.zeros(length, dtype=np.int8), categories=[value])
+
+def parse_csv_header(header: bytes) -> List[str]:
+    """Parse a raw CSV header line into its column names."""
+    return next(csv.reader([header.decode('utf-8')]))
+
+class BufferWriter(RawIOBase):
+    """
+    Seekable, writable stream over a preallocated buffer.
+    
+    Lets a blob download be written straight into a bytearray of the blob's size with
+    readinto() (including parallel range writes), instead of a BytesIO that keeps
+    reallocating as it grows.
+    """
+    
+    def __init__(self, buffer):
+        self._view = memoryview(buffer)
+        self._pos = 0
+    
+    def writable(self):
+        return True
+    
+    def seekable(self):
+        return True
+    
+    def tell(self):
+        return self._pos
+    
+    def seek(self, offset, whence=os.SEEK_SET):
+        base = {os.SEEK_SET: 0, os.SEEK_CUR: self._pos, os.SEEK_END: len(self._view)}[whence]
+        self._pos = base + offset
+        return self._pos
+    
+    def write(self, data):
+        size = len(data)
+        self._view[self._pos:self._pos + size] = data
+        self._pos += size
+        return size
+
+def create_transport() -> RequestsTransport:
+    """
+    Create the HTTP transport for a BlobServiceClient.
+    
+    The connection pool is widened to HTTP_POOL_SIZE so concurrent blob downloads (each
+    possibly split into range requests) reuse connections instead of discarding them
+    with "Connection pool is full" warnings, and response bodies are read in
+    HTTP_READ_BLOCK_SIZE chunks. The storage SDK only applies its own timeouts when it
+    builds the transport itself, so they are set here as well: connection attempts and
+    reads that stall give up after HTTP_CONNECT_TIMEOUT and HTTP_READ_TIMEOUT so the
+    SDK's retry policy takes over.
+    """
+    transport = RequestsTransport(
+        connection_data_block_size=HTTP_READ_BLOCK_SIZE,
+        connection_timeout=HTTP_CONNECT_TIMEOUT,
+        read_timeout=HTTP_READ_TIMEOUT
+    )
+    transport.open()
+    for adapter in transport.session.adapters.values():
+        adapter.init_poolmanager(HTTP_POOL_SIZE, HTTP_POOL_SIZE)
+    return transport
+
+@functools.lru_cache(maxsize=None)
+def get_azure_ad_client(
+    account_url: str, credential_type: str = "default", managed_identity_client_id: str = None
+) -> BlobServiceClient:
+    """
+    Return a BlobServiceClient for account_url authenticated with Azure AD.
+    
+    Clients are cached per account URL and credential settings, so repeated merges share
+    one connection pool and one credential (and its token cache) instead of repeating
+    credential discovery.
+    
+    Args:
+        account_url (str): Storage account URL
+        credential_type (str): Key of AZURE_AD_CREDENTIALS selecting the credential class
+        managed_identity_client_id (str): Client ID of a user-assigned managed identity.
+            If None, AZURE_CLIENT_ID is used when set, otherwise the system-assigned identity
+    """
+    if credential_type == 'managed_identity':
+        # ManagedIdentityCredential doesn't read AZURE_CLIENT_ID itself, unlike the default chain
+        client_id = managed_identity_client_id or os.environ.get("AZURE_CLIENT_ID")
+        credential = ManagedIdentityCredential(client_id=client_id)
+    elif credential_type == 'default' and managed_identity_client_id:
+        # Only passed when given: an explicit None would override AZURE_CLIENT_ID
+        credential = DefaultAzureCredential(managed_identity_client_id=managed_identity_client_id)
+    else:
+        credential = AZURE_AD_CREDENTIALS[credential_type]()
+    return BlobServiceClient(account_url=account_url, credential=credential, transport=create_transport())
+
+def download_blobs(container_client, blob_list, max_workers: int = 8, transform=None):
+    """
+    Download blobs concurrently while yielding them in their original order.
+    
+    At most max_workers downloads are in flight at any time, and no more are started
+    once the listed sizes of those waiting reach DOWNLOAD_WINDOW_BYTES, so memory stays
+    bounded no matter how many (or how large) blobs are listed. Blobs too large for a
+    single GET are further split into BLOB_DOWNLOAD_CONCURRENCY parallel range requests.
+    
+    Args:
+        container_client: Azure ContainerClient the blobs belong to
+        blob_list (list): Blobs to download (anything with a .name attribute)
+        max_workers (int): Number of concurrent downloads
+        transform (callable): Optional function applied to the downloaded bytes inside
+            the worker thread (e.g. a CSV parser), so it overlaps with the caller
+    
+    Yields:
+        tuple: (blob, future) where future.result() returns the blob content as a bytearray
+            (or the transform's result) or raises the download error
+    """
+    def download(blob):
+        blob_client = container_client.get_blob_client(blob.name)
+        downloader = blob_client.download_blob(max_concurrency=BLOB_DOWNLOAD_CONCURRENCY)
+        # The size is known from the first response, so the content is written into one
+        # buffer of exactly that size
+        content = bytearray(downloader.size)
+        downloader.readinto(BufferWriter(content))
+        return transform(content) if transform else content
+    
+    blobs = iter(blob_list)
+    pending = deque()
+    pending_bytes = 0
+    
+    def submit_downloads():
+        nonlocal pending_bytes
+        # Always keep the next blob coming; beyond that stop at max_workers downloads or
+        # once the waiting blobs add up to the window
+        while not pending or (len(pending) < max_workers and pending_bytes < DOWNLOAD_WINDOW_BYTES):
+            blob = next(blobs, None)
+            if blob is None:
+                return
+            pending.append((blob, executor.submit(download, blob)))
+            pending_bytes += getattr(blob, 'size', None) or 0
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        submit_downloads()
+        while pending:
+            blob, future = pending.popleft()
+            pending_bytes -= getattr(blob, 'size', None) or 0
+            # Keep the pool busy while the caller handles this blob
+            submit_downloads()
+            yield blob, future
+
 def merge_csv_files_by_pattern(
     container_name: str,
     storage_account_name: str = None,
@@ -24,7 +357,11 @@ def merge_csv_files_by_pattern(
     log_file: str = None,
     upload_to_azure: bool = False,
     upload_container: str = None,
-    upload_path: str = ""
+    upload_path: str = "",
+    download_workers: int = 8,
+    skip_unchanged: bool = False,
+    credential_type: str = "default",
+    managed_identity_client_id: str = None
 ):
     """
     Merge CSV files from Azure Blob Storage based on filename patterns.
@@ -47,6 +384,14 @@ def merge_csv_files_by_pattern(
         upload_to_azure (bool): Whether to upload merged files back to Azure
         upload_container (str): Container name for uploading merged files. If None, uses same as source container
         upload_path (str): Path within upload container where files should be stored
+        download_workers (int): Number of blobs downloaded concurrently while merging
+        skip_unchanged (bool): Skip merging a group whose output was produced from the same
+            blobs (by etag) and settings in a previous run, as recorded in a
+            <output>.manifest.json file next to it
+        credential_type (str): Azure AD credential to use: "default" (DefaultAzureCredential),
+            "cli" (AzureCliCredential) or "managed_identity" (ManagedIdentityCredential)
+        managed_identity_client_id (str): Client ID of a user-assigned managed identity. If
+            None, AZURE_CLIENT_ID is used when set, otherwise the system-assigned identity
     """
     
     # Setup logging
@@ -61,12 +406,19 @@ def merge_csv_files_by_pattern(
     logging.getLogger("azure.storage").setLevel(logging.WARNING)
     logging.getLogger("azure.identity").setLevel(logging.WARNING)
     
-    # Configure our application logging
+    # Configure our application logging. Log file writes are buffered and flushed in
+    # batches, on errors and when the run completes, rather than after every record.
+    log_format = '%(asctime)s - %(levelname)s - %(message)s'
+    file_handler = logging.FileHandler(log_file, mode='w')
+    file_handler.setFormatter(logging.Formatter(log_format))
+    buffered_file_handler = logging.handlers.MemoryHandler(
+        LOG_BUFFER_RECORDS, flushLevel=logging.ERROR, target=file_handler
+    )
     logging.basicConfig(
         level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
+        format=log_format,
         handlers=[
-            logging.FileHandler(log_file, mode='w'),
+            buffered_file_handler,
             logging.StreamHandler()
         ],
         force=True  # Override any existing logging configuration
@@ -94,27 +446,28 @@ def merge_csv_files_by_pattern(
             account_url = f"https://{storage_account_name}.blob.core.windows.net"
         elif not account_url:
             raise ValueError("Either account_url or storage_account_name must be provided for Azure AD auth")
+        if credential_type not in AZURE_AD_CREDENTIALS:
+            raise ValueError(f"credential_type must be one of {list(AZURE_AD_CREDENTIALS)}, got '{credential_type}'")
         
         # Try different Azure AD credential types
         try:
-            # DefaultAzureCredential tries multiple auth methods in order:
+            # DefaultAzureCredential (credential_type "default") tries multiple auth methods in order:
             # 1. Environment variables
             # 2. Managed identity
             # 3. Azure CLI
             # 4. Visual Studio Code
             # 5. Azure PowerShell
-            azure_credential = DefaultAzureCredential()
-            blob_service_client = BlobServiceClient(account_url=account_url, credential=azure_credential)
-            logger.info("✅ Using Azure AD authentication (DefaultAzureCredential)")
+            blob_service_client = get_azure_ad_client(account_url, credential_type, managed_identity_client_id)
+            logger.info(f"✅ Using Azure AD authentication ({AZURE_AD_CREDENTIALS[credential_type].__name__})")
         except Exception as e:
             logger.error(f"Azure AD auth failed: {e}")
             logger.error("Make sure you're logged in with 'az login' or running in an environment with managed identity")
             return
     elif connection_string:
-        blob_service_client = BlobServiceClient.from_connection_string(connection_string)
+        blob_service_client = BlobServiceClient.from_connection_string(connection_string, transport=create_transport())
         logger.info("✅ Using connection string authentication")
     elif account_url and credential:
-        blob_service_client = BlobServiceClient(account_url=account_url, credential=credential)
+        blob_service_client = BlobServiceClient(account_url=account_url, credential=credential, transport=create_transport())
         logger.info("✅ Using SAS token/account key authentication")
     else:
         error_msg = "Authentication method required: use_azure_ad=True with storage_account_name, or provide connection_string, or (account_url + credential)"
@@ -133,74 +486,60 @@ def merge_csv_files_by_pattern(
     else:
         logger.info(f"Processing entire container '{container_name}'")
     
-    # List blobs with prefix filter
-    try:
-        if base_path:
-            all_blobs = list(container_client.list_blobs(name_starts_with=base_path))
-        else:
-            all_blobs = list(container_client.list_blobs())
-        
-        csv_blobs = [blob for blob in all_blobs if blob.name.lower().endswith('.csv')]
-        logger.info(f"Found {len(csv_blobs)} CSV files in specified path")
-    except Exception as e:
-        logger.error(f"Error accessing container: {e}")
-        return
-    
-    # Filter blobs based on subfolders within base_path
-    filtered_blobs = []
-    
+    # Let the server filter by folder: list everything under base_path, or one prefix per
+    # subfolder plus a non-recursive walk of the base_path root. Each listing comes back
+    # in name order, so merging them keeps the files in the same order as one listing.
     if subfolders is None:
-        # Process all CSV files under base_path
-        filtered_blobs = csv_blobs
+        listing = container_client.list_blobs(name_starts_with=base_path or None)
     else:
-        # Process files in specific subfolders under base_path
-        for blob in csv_blobs:
+        prefixes = sorted({f"{base_path}{subfolder.strip('/')}/" for subfolder in subfolders})
+        # Skip subfolders nested in another listed one so no blob is listed twice
+        prefixes = [prefix for i, prefix in enumerate(prefixes) if not prefix.startswith(tuple(prefixes[:i]))]
+        listings = [container_client.list_blobs(name_starts_with=prefix) for prefix in prefixes]
+        if include_root:
+            # Subfolders come back as prefix entries, which the .csv check below skips
+            listings.append(container_client.walk_blobs(name_starts_with=base_path or None, delimiter='/'))
+        listing = heapq.merge(*listings, key=lambda blob: blob.name)
+    
+    # Filter and classify the listing in a single pass as the pages arrive, instead of
+    # holding the whole container listing in memory first. Files are separated based on
+    # the truth pattern (case insensitive match on the file name).
+    truth_blobs = []
+    other_blobs = []
+    truth_regex = re.compile(re.escape(truth_pattern), re.IGNORECASE)
+    csv_count = 0
+    try:
+        for blob in listing:
             blob_path = blob.name
-            
-            # Remove base_path prefix to get relative path
-            if base_path and blob_path.startswith(base_path):
-                relative_path = blob_path[len(base_path):]
-            else:
-                relative_path = blob_path
-            
-            # Check if file is in root of base_path (no additional '/' in relative path)
-            if include_root and '/' not in relative_path:
-                filtered_blobs.append(blob)
+            if blob_path[-4:].lower() != '.csv':
                 continue
+            csv_count += 1
             
-            # Check if file is in any of the specified subfolders under base_path
-            for subfolder in subfolders:
-                subfolder_normalized = subfolder.strip('/')
-                if relative_path.startswith(subfolder_normalized + '/'):
-                    filtered_blobs.append(blob)
-                    break
+            filename = blob_path.rsplit('/', 1)[-1]
+            if truth_regex.search(filename):
+                truth_blobs.append(blob)
+            else:
+                other_blobs.append(blob)
+        logger.info(f"Found {csv_count} CSV files in specified path")
+    except Exception as e:
+        logger.error(f"Error accessing container: {e}")
+        return
     
-    print(f"Processing {len(filtered_blobs)} CSV files after filtering")
+    print(f"Processing {len(truth_blobs) + len(other_blobs)} CSV files after filtering")
     
-    if not filtered_blobs:
+    if not truth_blobs and not other_blobs:
         print("No CSV files found matching the criteria")
         return
     
-    # Separate files based on truth pattern
-    truth_blobs = []
-    other_blobs = []
-    
-    for blob in filtered_blobs:
-        filename = os.path.basename(blob.name).lower()
-        if truth_pattern.lower() in filename:
-            truth_blobs.append(blob)
-        else:
-            other_blobs.append(blob)
-    
     print(f"Truth files: {len(truth_blobs)}")
     print(f"Other files: {len(other_blobs)}")
     
     # Function to upload file to Azure
+    upload_container_name = upload_container or container_name
+    upload_container_client = blob_service_client.get_container_client(upload_container_name)
+    
     def upload_to_azure_blob(local_filename, blob_path):
         try:
-            upload_container_name = upload_container or container_name
-            upload_container_client = blob_service_client.get_container_client(upload_container_name)
-            
             # Ensure upload path ends with / if it's not empty
             if upload_path and not upload_path.endswith('/'):
                 full_blob_path = f"{upload_path}/{blob_path}"
@@ -209,11 +548,13 @@ def merge_csv_files_by_pattern(
             else:
                 full_blob_path = blob_path
             
-            with open(local_filename, 'rb') as data:
+            with open(local_filename, 'rb', buffering=IO_BUFFER_SIZE) as data:
                 upload_container_client.upload_blob(
                     name=full_blob_path, 
                     data=data, 
-                    overwrite=True
+                    length=os.path.getsize(local_filename),
+                    overwrite=True,
+                    max_concurrency=BLOB_UPLOAD_CONCURRENCY
                 )
             
             logger.info(f"✅ Uploaded {local_filename} to {upload_container_name}/{full_blob_path}")
@@ -229,61 +570,198 @@ def merge_csv_files_by_pattern(
             return
         
         logger.info(f"=== Merging {file_type} Files ===")
-        merged_data = []
+        
+        # Inputs and settings this output is built from, used to skip unchanged reruns
+        manifest_path = f"{output_filename}.manifest.json"
+        manifest = {
+            "settings": {
+                "container_name": container_name,
+                "add_metadata": add_metadata,
+                "upload": [upload_container or container_name, upload_path] if upload_to_azure else None,
+            },
+            "blobs": {blob.name: blob.etag for blob in blob_list},
+        }
+        if skip_unchanged and os.path.exists(output_filename):
+            try:
+                with open(manifest_path) as f:
+                    unchanged = json.load(f) == manifest
+            except (OSError, ValueError):
+                unchanged = False
+            if unchanged:
+                logger.info(f"⏭️  {output_filename} is up to date with its {len(blob_list)} {file_type} files, skipping")
+                logger.info("")
+                return output_filename
+        # The output is about to be replaced, so a manifest from an earlier run no longer
+        # describes it; a new one is written only once this run completes
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
         successful_files = []
         failed_files = []
         
-        for i, blob in enumerate(blob_list, 1):
+        # Files are streamed straight into a part file while their columns match: as raw
+        # bytes when the header allows it, otherwise as parsed frames. A file with different
+        # columns starts a new part, and the parts are aligned into the output at the end.
+        parts = []
+        outfile = None
+        header = None
+        part_newline = None
+        columns = []
+        total_rows = 0
+        
+        def start_part(part_columns, blob_name):
+            nonlocal outfile, columns
+            if outfile is not None:
+                outfile.close()
+                logger.info(f"  Columns or line endings of {blob_name} differ, output will be aligned")
+            columns = part_columns
+            part_path = f"{output_filename}.part{len(parts)}"
+            parts.append((part_path, columns))
+            outfile = open(part_path, 'wb', buffering=IO_BUFFER_SIZE)
+        
+        # Metadata columns from previous merges are left out while parsing
+        def parse_blob(data):
+            return read_csv_bytes(data, skip_columns=METADATA_COLUMNS)
+        
+        # Downloads run ahead in a thread pool while this loop writes. With metadata every
+        # blob goes through pandas, so the workers parse it as well.
+        blobs = download_blobs(
+            container_client, blob_list, min(download_workers, len(blob_list)),
+            transform=parse_blob if add_metadata else None
+        )
+        for i, (blob, download) in enumerate(blobs, 1):
             try:
-                # Download blob content
-                blob_client = container_client.get_blob_client(blob.name)
-                blob_content = blob_client.download_blob().readall().decode('utf-8')
+                content = download.result()
+                
+                if not add_metadata:
+                    blob_bytes = content
+                    header_end = blob_bytes.find(b'\n') + 1 or len(blob_bytes)
+                    header_line = blob_bytes[:header_end].removeprefix(codecs.BOM_UTF8)
+                    # The file's own line ending is kept, so CRLF inputs stay CRLF
+                    newline = b'\r\n' if header_line.endswith(b'\r\n') else b'\n'
+                    blob_header = header_line.rstrip(b'\r\n')
+                    if not blob_header.strip():
+                        raise ValueError("No columns to parse from file")
+                    rows = blob_bytes.count(b'\n', header_end)
+                    crlf_rows = blob_bytes.count(b'\r\n', header_end)
+                    
+                    # Identical header bytes and line endings are the common case and need no
+                    # parsing; otherwise compare the parsed names, which may just be quoted
+                    # differently. A file whose line endings change part-way, or whose header
+                    # carries metadata columns from a previous merge or repeated column names
+                    # (renamed a, a.1, ... when parsed), goes through pandas below.
+                    blob_columns = None
+                    if crlf_rows != (rows if newline == b'\r\n' else 0):
+                        blob_columns = False
+                    elif blob_header != header or newline != part_newline:
+                        blob_columns = parse_csv_header(blob_header)
+                        if (any(col in METADATA_COLUMNS for col in blob_columns)
+                                or len(set(blob_columns)) < len(blob_columns)):
+                            blob_columns = False
+                        elif blob_columns != columns or newline != part_newline:
+                            # Files with other line endings get their own part, so no part
+                            # mixes them; combining the parts writes one consistent ending
+                            start_part(blob_columns, blob.name)
+                            header = blob_header
+                            part_newline = newline
+                            outfile.write(blob_header + newline)
+                    
+                    if blob_columns is not False:
+                        # Append everything after the header, making sure the file ends with a newline
+                        outfile.write(memoryview(blob_bytes)[header_end:])
+                        if len(blob_bytes) > header_end and not blob_bytes.endswith(b'\n'):
+                            outfile.write(newline)
+                            rows += 1
+                        
+                        total_rows += rows
+                        successful_files.append((blob.name, rows))
+                        logger.info(f"  [{i}/{len(blob_list)}] ✅ Added {blob.name} ({rows} rows)")
+                        continue
                 
-                # Read CSV from string
-                df = pd.read_csv(StringIO(blob_content))
+                # Parse CSV content
+                df = content if add_metadata else parse_blob(content)
                 
-                # Filter out metadata columns if they exist (from previous merges)
-                metadata_columns = ['source_file', 'source_path', 'file_size', 'merge_timestamp', 'container_name']
-                df = df.drop(columns=[col for col in metadata_columns if col in df.columns])
+                # Filter out metadata columns still present (only when parsing couldn't
+                # project them away, e.g. a file with nothing but metadata columns)
+                metadata_present = [col for col in METADATA_COLUMNS if col in df.columns]
+                if metadata_present:
+                    df = df.drop(columns=metadata_present)
+                if df.columns.empty:
+                    raise ValueError("File only has metadata columns from a previous merge")
                 
                 # Add metadata columns only if requested
                 if add_metadata:
-                    df['source_file'] = os.path.basename(blob.name)
-                    df['source_path'] = blob.name
-                    df['container_name'] = container_name
+                    df['source_file'] = constant_column(os.path.basename(blob.name), len(df))
+                    df['source_path'] = constant_column(blob.name, len(df))
+                    df['container_name'] = constant_column(container_name, len(df))
+                
+                # Format the rows before touching the part file, so a file that fails to
+                # write leaves no partial rows (or empty new part) behind
+                new_part = outfile is None or list(df.columns) != columns or part_newline != b'\n'
+                rendered = BytesIO()
+                write_csv(df, rendered, include_header=new_part)
+                if new_part:
+                    start_part(list(df.columns), blob.name)
+                    header = None
+                    part_newline = b'\n'
+                outfile.write(rendered.getbuffer())
                 
-                merged_data.append(df)
-                successful_files.append(blob.name)
+                total_rows += len(df)
+                successful_files.append((blob.name, len(df)))
                 logger.info(f"  [{i}/{len(blob_list)}] ✅ Added {blob.name} ({len(df)} rows)")
                 
             except Exception as e:
                 failed_files.append((blob.name, str(e)))
                 logger.error(f"  [{i}/{len(blob_list)}] ❌ Error reading {blob.name}: {e}")
+            finally:
+                # Release this blob's data (the future holds it too) before waiting on the
+                # next download, so only in-flight downloads are held in memory
+                download = content = blob_bytes = df = rendered = None
         
-        if merged_data:
-            # Concatenate all dataframes
-            final_df = pd.concat(merged_data, ignore_index=True)
-            
-            # Save merged file locally first
-            final_df.to_csv(output_filename, index=False)
+        # The merged file only appears once it is complete: a single part is renamed into
+        # place, several are combined into a temporary file that replaces it
+        if outfile is not None:
+            outfile.close()
+        # If no file was merged at all, an existing output is left as it was.
+        try:
+            if successful_files and len(parts) == 1:
+                os.replace(parts[0][0], output_filename)
+            elif successful_files and parts:
+                # Align the columns of all parts into the merged file
+                columns = combine_csv_parts(parts, f"{output_filename}.tmp")
+                os.replace(f"{output_filename}.tmp", output_filename)
+        except Exception as e:
+            logger.error(f"❌ FAILED: Could not write {output_filename}: {e}")
+            return None
+        finally:
+            # Part files (and a partial combined file) are never left behind
+            for path in [part_path for part_path, _ in parts] + [f"{output_filename}.tmp"]:
+                if os.path.exists(path):
+                    os.remove(path)
+        
+        if successful_files:
             logger.info(f"💾 Saved locally: {output_filename}")
             
             # Upload to Azure if requested
+            upload_success = True
             if upload_to_azure:
                 upload_success = upload_to_azure_blob(output_filename, output_filename)
                 if not upload_success:
                     logger.warning(f"⚠️  Local file {output_filename} saved but Azure upload failed")
             
+            # Record the inputs only for a complete run, so failures are retried next time
+            if skip_unchanged and upload_success and not failed_files:
+                with open(manifest_path, 'w') as f:
+                    json.dump(manifest, f)
+            
             logger.info(f"")
             logger.info(f"✅ SUCCESS: Merged {len(successful_files)} {file_type} files into {output_filename}")
-            logger.info(f"   Total rows: {len(final_df):,}")
-            logger.info(f"   Columns: {list(final_df.columns)}")
+            logger.info(f"   Total rows: {total_rows:,}")
+            logger.info(f"   Columns: {columns}")
             
             # Log detailed file list
             logger.info(f"")
             logger.info(f"=== Files Successfully Merged into {output_filename} ===")
-            for i, file_path in enumerate(successful_files, 1):
-                file_size = merged_data[i-1].shape[0]  # Number of rows
+            for i, (file_path, file_size) in enumerate(successful_files, 1):
                 logger.info(f"  {i:2d}. {file_path} ({file_size:,} rows)")
             
             if failed_files:
@@ -293,33 +771,34 @@ def merge_csv_files_by_pattern(
                     logger.warning(f"  {i:2d}. {file_path} - Error: {error}")
             
             logger.info("")
-            return final_df
+            return output_filename
         else:
             logger.error(f"❌ FAILED: No {file_type} files could be processed for {output_filename}")
             return None
     
-    # Show files to be processed and merge them
-    if truth_blobs:
-        logger.info("🔍 Truth files to be processed:")
-        for i, blob in enumerate(truth_blobs, 1):
-            logger.info(f"  {i:2d}. {blob.name}")
-        logger.info("")
-        merge_blobs(truth_blobs, truth_output, "truth")
-    
-    if other_blobs:
-        logger.info("📄 Other files to be processed:")
-        for i, blob in enumerate(other_blobs, 1):
-            logger.info(f"  {i:2d}. {blob.name}")
-        logger.info("")
-        merge_blobs(other_blobs, other_output, "other")
+    # Merge each group. merge_blobs logs every file as it is added, so the up-front
+    # listing of files to be processed is only produced at DEBUG level.
+    merge_groups = [
+        ("🔍 Truth files to be processed:", truth_blobs, truth_output, "truth"),
+        ("📄 Other files to be processed:", other_blobs, other_output, "other"),
+    ]
+    for title, blobs, output_filename, file_type in merge_groups:
+        if not blobs:
+            continue
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(title)
+            for i, blob in enumerate(blobs, 1):
+                logger.debug(f"  {i:2d}. {blob.name}")
+            logger.debug("")
+        merge_blobs(blobs, output_filename, file_type)
     
     logger.info("=== CSV Merger Log Completed ===")
     logger.info(f"Log saved to: {log_file}")
     
     # Close logging handlers to ensure file is written
-    for handler in logger.handlers[:]:
+    for handler in (buffered_file_handler, file_handler):
         handler.close()
-        logger.removeHandler(handler)
+        logging.getLogger().removeHandler(handler)
 
 def merge_csv_with_azure_ad(
     container_name: str,